@@ -1,15 +1,76 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
+from sqlalchemy import text
 from database import engine
 from notes.models import Base
 from routers import notes
 
+log = logging.getLogger(__name__)
 
-Base.metadata.create_all(bind=engine)
-app = FastAPI()
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+# Выключите (AUTO_CREATE_TABLES=0), если схемой управляют миграции
+AUTO_CREATE_TABLES = os.getenv("AUTO_CREATE_TABLES", "1") == "1"
+POOL_WARMUP_CONNECTIONS = 10
+NOTES_RECENT_REFRESH_SECONDS = 60
+
+NOTES_RECENT_DDL = (
+    "CREATE MATERIALIZED VIEW IF NOT EXISTS notes_recent AS "
+    "SELECT id, title, owner, created_at FROM notes ORDER BY id DESC LIMIT 1000",
+    # Уникальный индекс нужен для REFRESH ... CONCURRENTLY
+    "CREATE UNIQUE INDEX IF NOT EXISTS notes_recent_id_idx ON notes_recent (id)",
+)
+
+
+async def warm_pool(count: int = POOL_WARMUP_CONNECTIONS):
+    connections = await asyncio.gather(*(engine.connect() for _ in range(count)))
+    for conn in connections:
+        await conn.close()
+
+
+async def refresh_notes_recent():
+    # REFRESH ... CONCURRENTLY нельзя выполнять внутри транзакции,
+    # поэтому соединение переводим в AUTOCOMMIT
+    autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+    while True:
+        await asyncio.sleep(NOTES_RECENT_REFRESH_SECONDS)
+        try:
+            async with autocommit_engine.connect() as conn:
+                await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY notes_recent"))
+        except Exception:
+            log.exception("Не удалось обновить notes_recent")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if AUTO_CREATE_TABLES:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    # Представление создаем независимо от AUTO_CREATE_TABLES: деплой с
+    # миграциями иначе остался бы без notes_recent; IF NOT EXISTS делает
+    # эти операции идемпотентными
+    async with engine.begin() as conn:
+        for ddl in NOTES_RECENT_DDL:
+            await conn.execute(text(ddl))
+    await warm_pool()
+    redis = aioredis.from_url(REDIS_URL)
+    FastAPICache.init(RedisBackend(redis), prefix="notes")
+    refresh_task = asyncio.create_task(refresh_notes_recent())
+    yield
+    refresh_task.cancel()
+    await redis.aclose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.include_router(notes.router)
 
 @app.get("/")
 async def root():
     return {"message": "Hello World"}
-
@@ -1,4 +1,17 @@
-from sqlalchemy import String, Date
+from sqlalchemy import (
+    String,
+    Date,
+    Index,
+    DDL,
+    Computed,
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from datetime import date
 
@@ -13,5 +26,70 @@ class NoteDB(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str] = mapped_column(String(200))
     text: Mapped[str] = mapped_column(String)
-    owner: Mapped[str] = mapped_column(String(100))
-    created_at: Mapped[date] = mapped_column(Date)
\ No newline at end of file
+    owner: Mapped[str] = mapped_column(String(100), index=True)
+    created_at: Mapped[date] = mapped_column(
+        Date, server_default=func.current_date(), nullable=False, index=True
+    )
+    # Счетчик версий для ETag: инкрементируется при каждом обновлении
+    version: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    # Хранимый tsvector для полнотекстового поиска по заголовку и тексту
+    search_tsv: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple', coalesce(title,'') || ' ' || coalesce(text,''))",
+            persisted=True,
+        ),
+    )
+
+
+# Составной индекс под частый фильтр owner + диапазон created_at одним index-range scan
+Index(
+    "notes_owner_date_idx",
+    NoteDB.owner,
+    NoteDB.created_at,
+)
+
+# Триграммные GIN-индексы, чтобы поиск ILIKE '%...%' не делал полный скан таблицы
+Index(
+    "notes_title_trgm",
+    NoteDB.title,
+    postgresql_using="gin",
+    postgresql_ops={"title": "gin_trgm_ops"},
+)
+Index(
+    "notes_text_trgm",
+    NoteDB.text,
+    postgresql_using="gin",
+    postgresql_ops={"text": "gin_trgm_ops"},
+)
+
+# Функциональный B-tree индекс для якорных префиксных шаблонов: lower(title) LIKE 'abc%'
+Index(
+    "notes_title_lower_idx",
+    func.lower(NoteDB.title),
+)
+
+Index(
+    "notes_search_tsv_idx",
+    NoteDB.search_tsv,
+    postgresql_using="gin",
+)
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
+
+# Материализованное представление последних заметок для пути списка без фильтров.
+# Отдельный MetaData, чтобы create_all не пытался создать его как обычную таблицу.
+_views_metadata = MetaData()
+
+notes_recent = Table(
+    "notes_recent",
+    _views_metadata,
+    Column("id", Integer),
+    Column("title", String(200)),
+    Column("owner", String(100)),
+    Column("created_at", Date),
+)
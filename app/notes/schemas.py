@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import date
 
 
@@ -31,9 +31,9 @@ class Note(BaseModel):
         examples=["2025-12-28"]
     )
 
-    class Config:
-        from_attributes = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "id": 1,
                 "title": "Моя первая заметка",
@@ -42,6 +42,7 @@ class Note(BaseModel):
                 "created_at": "2025-12-28"
             }
         }
+    )
 
 
 class NoteCreate(BaseModel):
@@ -71,6 +72,14 @@ class NoteCreate(BaseModel):
         examples=["2025-12-28"]
     )
 
+class NoteCreateBulk(BaseModel):
+    items: List[NoteCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Заметки для создания одной транзакцией"
+    )
+
 class NoteUpdate(BaseModel):
     title: Optional[str] = Field(
         None,
@@ -97,3 +106,43 @@ class NoteUpdate(BaseModel):
         description="Новая дата создания",
         examples=["2025-12-28"]
     )
+
+class NoteSummary(BaseModel):
+    id: int = Field(
+        ...,
+        description="Уникальный идентификатор заметки",
+        examples=[1, 42]
+    )
+    title: str = Field(
+        ...,
+        description="Заголовок заметки",
+        examples=["Моя заметка"]
+    )
+    owner: str = Field(
+        ...,
+        description="Владелец заметки",
+        examples=["Иван"]
+    )
+    created_at: date = Field(
+        ...,
+        description="Дата и время создания заметки",
+        examples=["2025-12-28"]
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+class NotePage(BaseModel):
+    items: List[NoteSummary] = Field(
+        ...,
+        description="Заметки текущей страницы (без текста — полный текст отдает GET /notes/{id})"
+    )
+    next_cursor: Optional[int] = Field(
+        None,
+        description="Курсор для следующей страницы. Если None, заметок больше нет",
+        examples=[42]
+    )
+
+
+# Прогреваем схемы при импорте, чтобы компиляция валидаторов не пришлась на первый запрос
+for _model in (Note, NoteCreate, NoteCreateBulk, NoteUpdate, NoteSummary, NotePage):
+    _model.model_rebuild()
@@ -1,14 +1,30 @@
+import hashlib
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi_cache import FastAPICache
+from fastapi_cache.decorator import cache
+from sqlalchemy import select, insert, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
-from notes.models import NoteDB
-from notes.schemas import NoteUpdate, NoteCreate, Note
+from notes.models import NoteDB, notes_recent
+from notes.schemas import NoteUpdate, NoteCreate, NoteCreateBulk, Note, NotePage
 from datetime import date
 
 
 router = APIRouter(prefix="/notes", tags=["notes"])
 
+
+def request_key_builder(func, namespace="", *, request=None, response=None, args=(), kwargs=None):
+    # Ключ кэша строим только из пути и отсортированной строки запроса:
+    # стандартный key_builder хэширует kwargs, куда попадает сессия БД
+    # с уникальным repr, и кэш никогда не попадает в цель
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{namespace}:{request.url.path}?{query}"
+
+
+def note_etag(note: NoteDB) -> str:
+    return hashlib.blake2b(f"{note.id}:{note.version}".encode(), digest_size=8).hexdigest()
+
 @router.post("/new",
              response_model=Note,
              status_code=201,
@@ -35,18 +51,71 @@ router = APIRouter(prefix="/notes", tags=["notes"])
                  }
              }
              )
-def create_note(data: NoteCreate, db: Session = Depends(get_db)):
-    note = NoteDB(
-        title=data.title,
-        text=data.text,
-        owner=data.owner,
-        created_at = data.created_at or date.today()
-    )
+async def create_note(data: NoteCreate, db: AsyncSession = Depends(get_db)):
+    # created_at без значения не попадает в INSERT — дату подставит server_default
+    note = NoteDB(**data.model_dump(exclude_none=True))
     db.add(note)
-    db.commit()
-    db.refresh(note)
+    await db.commit()
+    await db.refresh(note)
+    await FastAPICache.clear()
     return note
 
+@router.post("/bulk",
+             response_model=List[Note],
+             status_code=201,
+             summary="Создать несколько заметок",
+             description="Создает пакет заметок одним INSERT и одним коммитом. "
+                         "Заметно быстрее последовательных вызовов /notes/new при массовой загрузке.",
+             response_description="Созданные заметки с уникальными ID",
+             responses={
+                 201: {
+                     "description": "Заметки успешно созданы",
+                     "content": {
+                         "application/json": {
+                             "example": [
+                                 {
+                                     "id": 1,
+                                     "title": "Моя заметка",
+                                     "text": "Текст заметки",
+                                     "owner": "Я",
+                                     "created_at": "2025-12-28"
+                                 },
+                                 {
+                                     "id": 2,
+                                     "title": "Еще заметка",
+                                     "text": "Текст еще одной заметки",
+                                     "owner": "Я",
+                                     "created_at": "2025-12-28"
+                                 }
+                             ]
+                         }
+                     }
+                 },
+                 422: {
+                     "description": "Ошибка валидации данных"
+                 }
+             }
+             )
+async def create_notes_bulk(data: NoteCreateBulk, db: AsyncSession = Depends(get_db)):
+    stmt = (
+        insert(NoteDB)
+        .values([
+            {
+                "title": item.title,
+                "text": item.text,
+                "owner": item.owner,
+                "created_at": item.created_at or date.today(),
+            }
+            for item in data.items
+        ])
+        .returning(NoteDB)
+    )
+    result = await db.execute(stmt)
+    notes = result.scalars().all()
+    await db.commit()
+    await FastAPICache.clear()
+    return notes
+
 @router.get("/{id}",
             response_model=Note,
             summary="Получить заметку по ID",
@@ -67,6 +136,9 @@ def create_note(data: NoteCreate, db: Session = Depends(get_db)):
                         }
                     }
                 },
+                304: {
+                    "description": "Заметка не изменилась с момента последнего запроса (по If-None-Match)"
+                },
                 404: {
                     "description": "Заметка не найдена",
                     "content": {
@@ -76,44 +148,53 @@ def create_note(data: NoteCreate, db: Session = Depends(get_db)):
                     }
                 }
             })
-def get_note(id: int, db: Session = Depends(get_db)):
-    note = db.query(NoteDB).where(NoteDB.id == id).first()
+async def get_note(id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    note = await db.get(NoteDB, id)
     if not note:
         raise HTTPException(status_code=404, detail="Заметка не найдена")
+
+    etag = note_etag(note)
+    if request.headers.get("if-none-match") == etag:
+        raise HTTPException(status_code=304)
+
+    response.headers["ETag"] = etag
     return note
 
 @router.get("/",
-            response_model=List[Note],
+            response_model=NotePage,
             summary="Получить список заметок",
-            description="Возвращает список заметок с возможностью фильтрации и поиска",
-            response_description="Список заметок, соответствующих критериям поиска",
+            description="Возвращает страницу заметок с возможностью фильтрации и поиска. "
+                        "Для следующей страницы передайте next_cursor в параметре cursor.",
+            response_description="Страница заметок, соответствующих критериям поиска",
             responses={
                 200: {
                     "description": "Список заметок успешно получен",
                     "content": {
                         "application/json": {
-                            "example": [
-                                {
-                                    "id": 1,
-                                    "title": "Заметка 1",
-                                    "text": "Текст заметки 1",
-                                    "owner": "Я",
-                                    "created_at": "2025-12-28"
-                                },
-                                {
-                                    "id": 2,
-                                    "title": "Заметка 2",
-                                    "text": "Текст заметки 2",
-                                    "owner": "Не я",
-                                    "created_at": "2025-12-27"
-                                }
-                            ]
+                            "example": {
+                                "items": [
+                                    {
+                                        "id": 2,
+                                        "title": "Заметка 2",
+                                        "owner": "Не я",
+                                        "created_at": "2025-12-27"
+                                    },
+                                    {
+                                        "id": 1,
+                                        "title": "Заметка 1",
+                                        "owner": "Я",
+                                        "created_at": "2025-12-28"
+                                    }
+                                ],
+                                "next_cursor": 1
+                            }
                         }
                     }
                 }
             })
-def get_notes_list(
-        db: Session = Depends(get_db),
+@cache(expire=10, key_builder=request_key_builder)
+async def get_notes_list(
+        db: AsyncSession = Depends(get_db),
         owner: Optional[str] = Query(
             None,
             max_length=100,
@@ -123,7 +204,7 @@ def get_notes_list(
             None,
             min_length=1,
             max_length=200,
-            description="Поиск по заголовку и тексту заметки"
+            description="Поиск по заголовку и тексту заметки. Строка с '%' трактуется как LIKE-шаблон"
         ),
         date_from: Optional[date] = Query(
             None,
@@ -132,24 +213,62 @@ def get_notes_list(
         date_to: Optional[date] = Query(
             None,
             description="Показать заметки, созданные до этой даты (включительно)"
+        ),
+        limit: int = Query(
+            50,
+            ge=1,
+            le=500,
+            description="Максимальное число заметок на странице"
+        ),
+        cursor: Optional[int] = Query(
+            None,
+            description="Курсор страницы: вернуть заметки с id меньше этого значения"
         )):
 
-    query = db.query(NoteDB)
+    # Первая страница без фильтров — самый частый запрос; отдаем ее из
+    # материализованного представления, не трогая таблицу notes
+    if owner is None and search is None and date_from is None and date_to is None and cursor is None:
+        result = await db.execute(
+            select(notes_recent).order_by(notes_recent.c.id.desc()).limit(limit)
+        )
+        recent = result.all()
+        next_cursor = recent[-1].id if len(recent) == limit else None
+        return {"items": [row._asdict() for row in recent], "next_cursor": next_cursor}
+
+    # Выбираем только колонки списка: text не нужен и может быть сколь угодно длинным
+    query = select(NoteDB.id, NoteDB.title, NoteDB.owner, NoteDB.created_at)
+
+    if owner:
+        query = query.where(NoteDB.owner == owner)
+
+    if search:
+        if "%" not in search:
+            # Обычный поисковый запрос — полнотекстовый поиск по tsvector
+            query = query.where(NoteDB.search_tsv.op("@@")(func.plainto_tsquery("simple", search)))
+        elif not search.startswith("%"):
+            # Якорный шаблон ('abc%') — префиксный LIKE через функциональный индекс lower(title)
+            query = query.where(func.lower(NoteDB.title).like(func.lower(search)))
+        else:
+            # Шаблон с ведущим '%' — ILIKE, который обслуживают триграммные индексы
+            query = query.where((NoteDB.title.ilike(search)) | (NoteDB.text.ilike(search)))
 
-    filters = [
-        NoteDB.owner == owner if owner else None,
-        ((NoteDB.title.ilike(f"%{search}%")) | (NoteDB.text.ilike(f"%{search}%"))) if search else None,
-        NoteDB.created_at >= date_from if date_from else None,
-        NoteDB.created_at <= date_to if date_to else None,
-    ]
+    if date_from:
+        query = query.where(NoteDB.created_at >= date_from)
 
-    for f in filters:
-        if f is not None:
-            query = query.filter(f)
+    if date_to:
+        query = query.where(NoteDB.created_at <= date_to)
 
-    return query.all()
+    if cursor is not None:
+        query = query.where(NoteDB.id < cursor)
 
-@router.post("/update/{id}",
+    query = query.order_by(NoteDB.id.desc()).limit(limit)
+
+    result = await db.execute(query)
+    notes = result.all()
+    next_cursor = notes[-1].id if len(notes) == limit else None
+    return {"items": [row._asdict() for row in notes], "next_cursor": next_cursor}
+
+@router.put("/{id}",
              response_model=Note,
              summary="Обновить заметку",
              description="Обновляет существующую заметку. Можно обновить одно или несколько полей.",
@@ -181,21 +300,33 @@ def get_notes_list(
                      "description": "Ошибка валидации данных"
                  }
              })
-def update_note(id: int, data: NoteUpdate, db: Session = Depends(get_db)):
-    note = db.query(NoteDB).where(NoteDB.id == id).first()
+async def update_note(id: int, data: NoteUpdate, db: AsyncSession = Depends(get_db)):
+    update_data = data.model_dump(exclude_unset=True)
+
+    if not update_data:
+        note = await db.get(NoteDB, id)
+        if not note:
+            raise HTTPException(status_code=404, detail="Заметка не найдена")
+        return note
+
+    stmt = (
+        update(NoteDB)
+        .where(NoteDB.id == id)
+        .values(**update_data, version=NoteDB.version + 1)
+        .returning(NoteDB)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    note = result.scalar_one_or_none()
 
     if not note:
         raise HTTPException(status_code=404, detail="Заметка не найдена")
 
-    update_data = data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(note, field, value)
-
-    db.commit()
-    db.refresh(note)
+    await db.commit()
+    await FastAPICache.clear()
     return note
 
-@router.post("/delete/{id}",
+@router.delete("/{id}",
              status_code=204,
              summary="Удалить заметку",
              description="Удаляет заметку из базы данных по ID",
@@ -214,12 +345,18 @@ def update_note(id: int, data: NoteUpdate, db: Session = Depends(get_db)):
                  }
              }
              )
-def delete_note(id: int, db: Session = Depends(get_db)):
-    note = db.query(NoteDB).where(NoteDB.id == id).first()
+async def delete_note(id: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        delete(NoteDB)
+        .where(NoteDB.id == id)
+        .returning(NoteDB.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted_id = result.scalar_one_or_none()
 
-    if not note:
+    if deleted_id is None:
         raise HTTPException(status_code=404, detail="Заметка не найдена")
 
-    db.delete(note)
-    db.commit()
+    await db.commit()
+    await FastAPICache.clear()
     return True